@@ -1,9 +1,14 @@
+import csv
+import os
 import streamlit as st
 import pandas as pd
-import altair as alt
-import seaborn as sns
-import matplotlib.pyplot as plt
 import numpy as np
+import pyarrow as pa
+
+# Copy-on-Write lets shallow copies share column buffers until one side writes.
+# It is always on from pandas 3.0, where the option is deprecated.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 # -------------------------
 # Page Configuration
@@ -17,59 +22,385 @@ st.title("Star Wars Survey: Data Cleaning, Visualization & Analysis")
 # -------------------------
 # Helper Functions
 # -------------------------
+@st.cache_data
 def get_df_info(df: pd.DataFrame) -> pd.DataFrame:
     """
     Returns a DataFrame summarizing the input DataFrame's info.
     Columns include: Column name, Non-Null Count, Null Count, % Missing, Data Type, and Memory Usage.
+    Cached so the null scan and deep memory usage only run once per distinct DataFrame.
     """
+    n_rows = len(df)
+    null_counts = df.isnull().sum().values
     info_df = pd.DataFrame({
         "Column": df.columns,
-        "Non-Null Count": df.notnull().sum().values,
-        "Null Count": df.isnull().sum().values,
-        "% Missing": (df.isnull().sum().values / len(df)) * 100,
+        "Non-Null Count": n_rows - null_counts,
+        "Null Count": null_counts,
+        "% Missing": null_counts / n_rows * 100,
         "Data Type": df.dtypes.astype(str).values
     })
-    mem_usage = df.memory_usage(deep=True)[df.columns]
-    info_df["Memory Usage (Bytes)"] = mem_usage.values
+    # Only object columns need the deep per-element walk; every other dtype reports its buffer size directly
+    info_df["Memory Usage (Bytes)"] = [
+        col.memory_usage(index=False, deep=True) if col.dtype == object else col.values.nbytes
+        for _, col in df.items()
+    ]
     return info_df
 
-def load_data(filepath: str) -> pd.DataFrame:
+def sniff_delimiter(filepath: str) -> str:
+    """
+    Detects the delimiter from the first two lines, so the file is parsed once.
+    The header alone is not enough: the survey questions contain commas whatever the delimiter.
+    Falls back to a tab delimiter if the file cannot be opened or sniffed.
+    """
+    try:
+        with open(filepath, "r", newline="", encoding="utf-8", errors="ignore") as f:
+            sample = f.readline() + f.readline()
+        return csv.Sniffer().sniff(sample, delimiters=",\t;|").delimiter
+    except (OSError, csv.Error):
+        return "\t"
+
+def downcast_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the DataFrame with integer and float columns shrunk to the smallest dtype that holds their values.
+    Floats are only downcast when every value survives the round trip unchanged, so no value is ever rewritten.
+    """
+    df = df.copy(deep=False)
+    for col in df.select_dtypes(include="integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in df.select_dtypes(include="floating").columns:
+        # to_numeric only checks the float32 range, not precision
+        downcast = pd.to_numeric(df[col], downcast="float")
+        if downcast.dtype != df[col].dtype and downcast.astype(df[col].dtype).equals(df[col]):
+            df[col] = downcast
+    return df
+
+def cast_null_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the DataFrame with columns that hold no values at all stored as text.
+    The pyarrow parser types them as Arrow nulls (e.g. in a header-only file), which most operations reject.
+    """
+    null_dtype = pd.ArrowDtype(pa.null())
+    text_dtype = pd.ArrowDtype(pa.string())
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if dtype == null_dtype:
+            dtypes[col] = text_dtype
+        elif isinstance(dtype, pd.CategoricalDtype) and dtype.categories.dtype == null_dtype:
+            dtypes[col] = pd.CategoricalDtype(pd.Index([], dtype=text_dtype))
+    return df.astype(dtypes) if dtypes else df
+
+def get_data_key(filepath: str) -> tuple:
+    """
+    Returns (path, modification time, size) for a data file.
+    Cached helpers take it as data_key and their DataFrames underscore-prefixed, so Streamlit keys them on the
+    file version alone: results are computed once per version, and a regenerated file is never served stale.
+    """
+    stat = os.stat(filepath)
+    return (filepath, stat.st_mtime_ns, stat.st_size)
+
+# Low-cardinality survey columns parsed straight to 'category' instead of one string per row
+CSV_CATEGORY_DTYPES = dict.fromkeys(
+    ["Gender", "Age", "Household Income", "Education", "Location (Census Region)"], "category"
+)
+# Columns the app never shows or uses, skipped while parsing
+SKIPPED_CSV_COLUMNS = frozenset(["RespondentID"])
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def read_csv_file(filepath: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """
+    Parses a CSV file with the delimiter sniffed from its first two lines.
+    The header is read first so columns in SKIPPED_CSV_COLUMNS are left out; the rows are then parsed by the
+    multithreaded pyarrow engine into Arrow-backed columns, and numeric columns are downcast.
+    mtime_ns and size are only part of the cache key.
+    """
+    delimiter = sniff_delimiter(filepath)
+    header = pd.read_csv(filepath, delimiter=delimiter, nrows=0).columns
+    usecols = [col for col in header if col not in SKIPPED_CSV_COLUMNS]
+    # Only columns present in the file; the pyarrow engine rejects dtypes for missing ones on older pandas
+    dtype = {col: t for col, t in CSV_CATEGORY_DTYPES.items() if col in usecols}
+    df = pd.read_csv(filepath, delimiter=delimiter, engine="pyarrow", dtype_backend="pyarrow",
+                     dtype=dtype, usecols=usecols)
+    return downcast_numeric_columns(cast_null_columns(df))
+
+def load_data(filepath: str) -> tuple:
     """
-    Loads a CSV file. First tries a tab delimiter; if only one column is found, it retries using a comma.
-    (Caching has been removed to avoid using pyarrow.)
+    Loads a CSV file and returns (DataFrame, data key), or (None, None) on error.
+    The file is stat'ed once, so everything cached downstream is keyed on the version that was actually parsed.
+    Errors are reported outside the cached parse, so they are never cached.
     """
     try:
-        df = pd.read_csv(filepath, delimiter="\t")
-        if df.shape[1] == 1:
-            df = pd.read_csv(filepath, delimiter=",")
+        data_key = get_data_key(filepath)
+        df = read_csv_file(*data_key)
     except Exception as e:
         st.error(f"Error reading file '{filepath}': {e}")
-        return None
+        return None, None
+    return df, data_key
+
+# -------------------------
+# Cleaning Pipeline
+# -------------------------
+RENAME_MAPPING = {
+    "Have you seen any of the 6 films in the Star Wars franchise?": "seen_films",
+    "Do you consider yourself to be a fan of the Star Wars film franchise?": "is_fan",
+    "Which of the following Star Wars films have you seen? Please select all that apply.": "films_seen",
+    "Please rank the Star Wars films in order of preference with 1 being your favorite film in the franchise and 6 being your least favorite film.": "film_ranking",
+    "Please state whether you view the following characters favorably, unfavorably, or are unfamiliar with him/her.": "character_opinions",
+}
+RENAME_KEYS = frozenset(RENAME_MAPPING)
+# Filter and chart columns that are always stored as 'category', whatever their cardinality
+CATEGORICAL_COLUMNS = frozenset([
+    "Gender", "Age", "Household Income", "Education", "Location (Census Region)",
+    "is_fan", "seen_films", "films_seen", "character_opinions",
+])
+
+def drop_unnamed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the DataFrame without the 'Unnamed' placeholder columns left by the multi-row survey header.
+    """
+    unnamed_mask = df.columns.str.startswith("Unnamed")
+    return df.loc[:, ~unnamed_mask]
+
+def rename_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the DataFrame with the verbose survey questions renamed using RENAME_MAPPING.
+    """
+    cols_to_rename = RENAME_KEYS.intersection(df.columns)
+    return df.rename(columns={k: RENAME_MAPPING[k] for k in cols_to_rename})
+
+def fill_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the DataFrame with numeric gaps filled by the column median and all other gaps by "Not Specified".
+    Columns without missing values are left untouched.
+    """
+    null_counts = df.isnull().sum()
+    to_fill = null_counts.index[null_counts.values > 0]
+    if not len(to_fill):
+        return df
+    df = df.copy(deep=False)
+    # Integer columns with gaps load as nullable integers; fill them as floats so the median is not truncated
+    int_cols = df[to_fill].select_dtypes(include="integer").columns
+    if len(int_cols):
+        df[int_cols] = df[int_cols].astype("float64")
+    # Other typed columns with gaps (Arrow booleans, dates) cannot hold the fill label, so they are filled as text
+    other_cols = [
+        col for col in df[to_fill].select_dtypes(exclude=["number", "category"]).columns
+        if not pd.api.types.is_string_dtype(df[col].dtype)
+    ]
+    if other_cols:
+        df[other_cols] = df[other_cols].astype(pd.ArrowDtype(pa.string()))
+    # Categorical columns need the fill label as a category first; union keeps the categories sorted
+    for col in df[to_fill].select_dtypes(include="category").columns:
+        categories = df[col].cat.categories
+        if "Not Specified" not in categories:
+            df[col] = df[col].cat.set_categories(categories.union(pd.Index(["Not Specified"], dtype=categories.dtype)))
+    # One fill value per column, applied in a single fillna call
+    fill_map = dict.fromkeys(to_fill, "Not Specified")
+    num_cols = df[to_fill].select_dtypes(include="number").columns
+    # Skip the median reduction outright when no numeric column has gaps
+    if len(num_cols):
+        fill_map.update(df[num_cols].median().to_dict())
+    return df.fillna(fill_map)
+
+def categorize_columns(df: pd.DataFrame, max_unique_ratio: float = 0.5) -> pd.DataFrame:
+    """
+    Returns the DataFrame with low-cardinality text columns stored as 'category' (integer codes plus a small codebook).
+    Columns in CATEGORICAL_COLUMNS are always converted.
+    """
+    df = df.copy(deep=False)
+    for col in df.select_dtypes(exclude="number").columns:
+        if col in CATEGORICAL_COLUMNS or (len(df) and df[col].nunique(dropna=False) / len(df) < max_unique_ratio):
+            df[col] = df[col].astype("category")
+    return df
+
+@st.cache_resource(max_entries=1)
+def get_clean_data(data_key: tuple, _df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runs the full cleaning pipeline on the raw DataFrame and returns the cleaned DataFrame.
+    Held as a shared resource, so cache hits return the same frame without unpickling a copy;
+    callers must treat it as read-only.
+    """
+    df = fill_missing_values(rename_columns(drop_unnamed_columns(_df_raw)))
+    # Convert all object columns to string to ensure compatibility
+    for col in df.select_dtypes(include=["object"]).columns:
+        df[col] = df[col].astype("string")
+    df = categorize_columns(df)
+    # Numeric film ranking for the ranking histogram and numeric reports; non-numeric answers become NaN
+    if "film_ranking" in df.columns:
+        df["film_ranking_numeric"] = pd.to_numeric(df["film_ranking"].astype(str), errors="coerce").astype("float32")
     return df
 
+@st.cache_data(max_entries=1)
+def get_numeric_columns(data_key: tuple, _df: pd.DataFrame) -> tuple:
+    """
+    Returns the names of the numeric columns.
+    """
+    return tuple(_df.select_dtypes(include=["number"]).columns)
+
+def to_arrow_preview(df: pd.DataFrame, n_rows: int = 10) -> pa.Table:
+    """
+    Returns the first rows of a DataFrame as an Arrow table, which st.dataframe renders without converting again.
+    """
+    return pa.Table.from_pandas(df.head(n_rows), preserve_index=False)
+
+@st.cache_data(max_entries=1)
+def get_cleaning_stages(data_key: tuple, _df_raw: pd.DataFrame, _df_clean: pd.DataFrame) -> dict:
+    """
+    Returns display snapshots of every cleaning stage: Arrow previews, dropped columns, missing counts and info tables.
+    """
+    df_dropped = drop_unnamed_columns(_df_raw)
+    df_renamed = rename_columns(df_dropped)
+    return {
+        "raw_preview": to_arrow_preview(_df_raw),
+        "raw_info": get_df_info(_df_raw),
+        "unnamed_cols": _df_raw.columns[_df_raw.columns.str.startswith("Unnamed")].tolist(),
+        "dropped_preview": to_arrow_preview(df_dropped),
+        "renamed_preview": to_arrow_preview(df_renamed),
+        "missing_counts": df_renamed.isna().sum().to_frame("Missing Count"),
+        "clean_preview": to_arrow_preview(_df_clean),
+        "clean_info": get_df_info(_df_clean),
+    }
+
+@st.cache_data(max_entries=1)
+def get_summary_statistics(data_key: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns describe(include='all') of a DataFrame.
+    Columns mixing counts and text are stored as strings, so the table converts to Arrow without a retry.
+    """
+    summary = _df.describe(include="all")
+    text_cols = summary.select_dtypes(include="object").columns
+    return summary.astype(dict.fromkeys(text_cols, "string"))
+
+@st.cache_data
+def get_value_counts(data_key: tuple, col: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the value counts of a column as a two-column DataFrame (value, count).
+    Categorical columns are counted with a single np.bincount over their integer codes.
+    """
+    s = _df[col]
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        return s.value_counts().rename_axis(col).reset_index(name="count")
+    codes = s.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(s.cat.categories))
+    order = np.argsort(-counts, kind="stable")
+    return pd.DataFrame({col: s.cat.categories[order], "count": counts[order]})
+
+def get_bar_chart_spec(col: str, x_title: str, title: str, width: int = 600, height: int = 400) -> dict:
+    """
+    Returns a plain Vega-Lite spec of a value-count bar chart for a column, without data.
+    Render it with the counts from get_value_counts; written by hand, so no Altair building or validation is needed.
+    """
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": col, "type": "nominal", "title": x_title},
+            "y": {"field": "count", "type": "quantitative", "title": "Count"},
+            "tooltip": [
+                {"field": col, "type": "nominal"},
+                {"field": "count", "type": "quantitative"},
+            ],
+        },
+        "title": title,
+        "width": width,
+        "height": height,
+    }
+
+@st.cache_data
+def get_long_value_counts(data_key: tuple, cols: tuple, _df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the value counts of several columns stacked into one long DataFrame (variable, value, count).
+    Feeds a faceted chart, so all the columns are drawn from a single dataset.
+    """
+    return pd.concat(
+        [
+            get_value_counts(data_key, col, _df)
+            .rename(columns={col: "value"})
+            .astype({"value": str})
+            .assign(variable=col)
+            for col in cols
+        ],
+        ignore_index=True
+    )[["variable", "value", "count"]]
+
+def get_faceted_bar_chart_spec(cols: list, title: str, columns: int = 3, width: int = 300, height: int = 300) -> dict:
+    """
+    Returns a plain Vega-Lite spec drawing the value counts of several columns as one bar chart per column, without data.
+    Render it with the counts from get_long_value_counts; each panel keeps its own x axis.
+    """
+    return {
+        "facet": {"field": "variable", "type": "nominal", "sort": list(cols), "title": None},
+        "columns": columns,
+        "spec": {
+            "mark": {"type": "bar"},
+            "encoding": {
+                "x": {"field": "value", "type": "nominal", "title": None},
+                "y": {"field": "count", "type": "quantitative", "title": "Count"},
+                "tooltip": [
+                    {"field": "value", "type": "nominal"},
+                    {"field": "count", "type": "quantitative"},
+                ],
+            },
+            "width": width,
+            "height": height,
+        },
+        "resolve": {"scale": {"x": "independent"}},
+        "title": title,
+    }
+
+@st.cache_data
+def get_histogram_counts(data_key: tuple, col: str, _df: pd.DataFrame, bins: int = 10) -> pd.DataFrame:
+    """
+    Returns a histogram of a numeric column as a DataFrame of bin edges and counts (bin_start, bin_end, count).
+    Only these bin counts are sent to the browser, not every row.
+    """
+    values = _df[col].dropna().to_numpy()
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+def get_histogram_spec(x_title: str, title: str, width: int = 600, height: int = 400, y_title: str = "Count") -> dict:
+    """
+    Returns a plain Vega-Lite spec of a histogram drawn from get_histogram_counts, without data.
+    """
+    return {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "bin_start", "type": "quantitative", "title": x_title},
+            "x2": {"field": "bin_end"},
+            "y": {"field": "count", "type": "quantitative", "title": y_title},
+            "tooltip": [
+                {"field": "bin_start", "type": "quantitative"},
+                {"field": "bin_end", "type": "quantitative"},
+                {"field": "count", "type": "quantitative"},
+            ],
+        },
+        "title": title,
+        "width": width,
+        "height": height,
+    }
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_csv_bytes(data_key: tuple, filters: tuple, _df: pd.DataFrame) -> bytes:
+    """
+    Returns a filtered DataFrame encoded as UTF-8 CSV for download.
+    filters holds the active selections that produced the frame.
+    """
+    return _df.to_csv(index=False).encode("utf-8")
+
 # -------------------------
 # Load Data
 # -------------------------
 data_path = "star_wars.csv"
-df_raw = load_data(data_path)
+df_raw, data_key = load_data(data_path)
 if df_raw is None:
     st.stop()
 
-# Remove RespondentID from the raw data if present
-if "RespondentID" in df_raw.columns:
-    df_raw = df_raw.drop(columns=["RespondentID"])
-
-# Work on a copy for cleaning and further analysis
-df_clean = df_raw.copy()
-
-# Remove RespondentID from df_clean if present (should be already removed)
-if "RespondentID" in df_clean.columns:
-    df_clean = df_clean.drop(columns=["RespondentID"])
+# Fully cleaned data, computed once and shared across reruns; never modify it in place
+df_clean = get_clean_data(data_key, df_raw)
 
 # -------------------------
-# Main Tabs
+# Main Sections
 # -------------------------
-main_tab_labels = [
+# Streamlit runs every st.tabs body on each rerun, so the sections are picked
+# from the sidebar instead and only the selected one is rendered
+main_section_labels = [
     "Data Cleaning",
     "Basic Visualization",
     "Basic Statistical Reports",
@@ -77,13 +408,14 @@ main_tab_labels = [
     "Geospatial Visualization",
     "User Guide"
 ]
-main_tabs = st.tabs(main_tab_labels)
+page = st.sidebar.radio("Section", main_section_labels)
 
 # =========================
 # TAB 1: Data Cleaning
 # =========================
-with main_tabs[0]:
+if page == main_section_labels[0]:
     st.header("Data Cleaning")
+    stages = get_cleaning_stages(data_key, df_raw, df_clean)
     cleaning_tabs = st.tabs([
         "Original Data",
         "Drop Unwanted Columns",
@@ -93,58 +425,43 @@ with main_tabs[0]:
     ])
     # --- Original Data ---
     with cleaning_tabs[0]:
-        st.subheader("Original Data (First 10 Rows)")
-        st.dataframe(df_raw.head(10))
-        st.markdown("#### Data Information")
-        st.dataframe(get_df_info(df_raw))
+        # Preview and info side by side, laid out in a single container
+        preview_col, info_col = st.columns([2, 1])
+        with preview_col:
+            st.subheader("Original Data (First 10 Rows)")
+            st.dataframe(stages["raw_preview"])
+        with info_col:
+            st.markdown("#### Data Information")
+            st.dataframe(stages["raw_info"])
     # --- Drop Unwanted Columns ---
     with cleaning_tabs[1]:
         st.subheader("Drop Unwanted Columns")
-        unnamed_cols = [col for col in df_clean.columns if col.startswith("Unnamed")]
-        st.write("Columns to drop:", unnamed_cols)
-        df_clean = df_clean.drop(columns=unnamed_cols)
-        st.dataframe(df_clean.head(10))
+        st.write("Columns to drop:", stages["unnamed_cols"])
+        st.dataframe(stages["dropped_preview"])
     # --- Rename Columns ---
     with cleaning_tabs[2]:
         st.subheader("Rename Columns")
-        rename_mapping = {
-            "Have you seen any of the 6 films in the Star Wars franchise?": "seen_films",
-            "Do you consider yourself to be a fan of the Star Wars film franchise?": "is_fan",
-            "Which of the following Star Wars films have you seen? Please select all that apply.": "films_seen",
-            "Please rank the Star Wars films in order of preference with 1 being your favorite film in the franchise and 6 being your least favorite film.": "film_ranking",
-            "Please state whether you view the following characters favorably, unfavorably, or are unfamiliar with him/her.": "character_opinions",
-        }
         st.write("Renaming using the following mapping:")
-        st.write(rename_mapping)
-        df_clean = df_clean.rename(columns={k: v for k, v in rename_mapping.items() if k in df_clean.columns})
-        st.dataframe(df_clean.head(10))
+        st.write(RENAME_MAPPING)
+        st.dataframe(stages["renamed_preview"])
     # --- Handle Missing Data ---
     with cleaning_tabs[3]:
         st.subheader("Handle Missing Data")
         st.markdown("##### Missing Data Counts")
-        missing_counts = df_clean.isna().sum()
-        st.dataframe(missing_counts.to_frame("Missing Count"))
+        st.dataframe(stages["missing_counts"])
         st.write("Filling missing values:")
-        for col in df_clean.columns:
-            if pd.api.types.is_numeric_dtype(df_clean[col]):
-                df_clean[col] = df_clean[col].fillna(df_clean[col].median())
-            else:
-                df_clean[col] = df_clean[col].fillna("Not Specified")
-        st.dataframe(df_clean.head(10))
+        st.dataframe(stages["clean_preview"])
     # --- Final Cleaned Data ---
     with cleaning_tabs[4]:
         st.subheader("Final Cleaned Data (Preview)")
-        # Convert all object columns to string to ensure compatibility
-        for col in df_clean.select_dtypes(include=["object"]).columns:
-            df_clean[col] = df_clean[col].astype("string")
-        st.dataframe(df_clean.head(10))
+        st.dataframe(stages["clean_preview"])
         st.markdown("#### Data Information")
-        st.dataframe(get_df_info(df_clean))
+        st.dataframe(stages["clean_info"])
 
 # =========================
 # TAB 2: Basic Visualization
 # =========================
-with main_tabs[1]:
+if page == main_section_labels[1]:
     st.header("Basic Data Visualization")
     vis_tabs = st.tabs([
         "Fan Analysis",
@@ -157,57 +474,42 @@ with main_tabs[1]:
     with vis_tabs[0]:
         st.subheader("Fan Analysis")
         if 'is_fan' in df_clean.columns:
-            fan_counts = df_clean['is_fan'].value_counts().reset_index()
-            fan_counts.columns = ['is_fan', 'count']
-            chart = alt.Chart(fan_counts).mark_bar().encode(
-                x=alt.X('is_fan:N', title='Fan Status'),
-                y=alt.Y('count:Q', title='Count'),
-                tooltip=['is_fan', 'count']
-            ).properties(title="Fan Status Distribution", width=600, height=400)
-            st.altair_chart(chart, use_container_width=True)
+            counts = get_value_counts(data_key, 'is_fan', df_clean)
+            spec = get_bar_chart_spec('is_fan', 'Fan Status', "Fan Status Distribution")
+            st.vega_lite_chart(counts, spec, use_container_width=True)
         else:
             st.write("Column 'is_fan' not found.")
     # --- Film Viewing ---
     with vis_tabs[1]:
         st.subheader("Film Viewing Analysis")
         if 'seen_films' in df_clean.columns:
-            seen_counts = df_clean['seen_films'].value_counts().reset_index()
-            seen_counts.columns = ['seen_films', 'count']
-            chart = alt.Chart(seen_counts).mark_bar().encode(
-                x=alt.X('seen_films:N', title='Seen Films'),
-                y=alt.Y('count:Q', title='Count'),
-                tooltip=['seen_films', 'count']
-            ).properties(title="Film Viewing Distribution", width=600, height=400)
-            st.altair_chart(chart, use_container_width=True)
+            counts = get_value_counts(data_key, 'seen_films', df_clean)
+            spec = get_bar_chart_spec('seen_films', 'Seen Films', "Film Viewing Distribution")
+            st.vega_lite_chart(counts, spec, use_container_width=True)
         else:
             st.write("Column 'seen_films' not found.")
     # --- Demographics ---
     with vis_tabs[2]:
         st.subheader("Demographics Analysis")
+        demographic_cols = []
         for col in ["Gender", "Age", "Household Income", "Education", "Location (Census Region)"]:
             if col in df_clean.columns:
-                counts = df_clean[col].value_counts().reset_index()
-                counts.columns = [col, "count"]
-                chart = alt.Chart(counts).mark_bar().encode(
-                    x=alt.X(f"{col}:N", title=col),
-                    y=alt.Y("count:Q", title="Count"),
-                    tooltip=[col, "count"]
-                ).properties(title=f"{col} Distribution", width=300, height=300)
-                st.altair_chart(chart, use_container_width=True)
+                demographic_cols.append(col)
             else:
                 st.write(f"Column '{col}' not found.")
+        if demographic_cols:
+            # All panels are drawn as one faceted chart instead of one chart per column
+            counts = get_long_value_counts(data_key, tuple(demographic_cols), df_clean)
+            spec = get_faceted_bar_chart_spec(demographic_cols, "Demographics Distribution")
+            st.vega_lite_chart(counts, spec)
     # --- Film Ranking ---
     with vis_tabs[3]:
         st.subheader("Film Ranking Analysis")
         if 'film_ranking' in df_clean.columns:
             try:
-                df_clean['film_ranking_numeric'] = pd.to_numeric(df_clean['film_ranking'], errors='coerce')
-                ranking_chart = alt.Chart(df_clean).mark_bar().encode(
-                    alt.X("film_ranking_numeric:Q", bin=alt.Bin(maxbins=10), title="Film Ranking"),
-                    y=alt.Y('count()', title='Count'),
-                    tooltip=['count()']
-                ).properties(title="Film Ranking Histogram", width=600, height=400)
-                st.altair_chart(ranking_chart, use_container_width=True)
+                ranking_counts = get_histogram_counts(data_key, 'film_ranking_numeric', df_clean)
+                spec = get_histogram_spec("Film Ranking", "Film Ranking Histogram")
+                st.vega_lite_chart(ranking_counts, spec, use_container_width=True)
             except Exception as e:
                 st.write(f"Error: {e}")
         else:
@@ -216,52 +518,59 @@ with main_tabs[1]:
     with vis_tabs[4]:
         st.subheader("Character Opinions Analysis")
         if 'character_opinions' in df_clean.columns:
-            opinions = df_clean['character_opinions'].value_counts().reset_index()
-            opinions.columns = ['character_opinions', 'count']
-            opinion_chart = alt.Chart(opinions).mark_bar().encode(
-                x=alt.X('character_opinions:N', title='Character Opinion'),
-                y=alt.Y('count:Q', title='Count'),
-                tooltip=['character_opinions', 'count']
-            ).properties(title="Character Opinions Distribution", width=600, height=400)
-            st.altair_chart(opinion_chart, use_container_width=True)
+            counts = get_value_counts(data_key, 'character_opinions', df_clean)
+            spec = get_bar_chart_spec('character_opinions', 'Character Opinion', "Character Opinions Distribution")
+            st.vega_lite_chart(counts, spec, use_container_width=True)
         else:
             st.write("Column 'character_opinions' not found.")
 
 # =========================
 # TAB 3: Basic Statistical Reports
 # =========================
-with main_tabs[2]:
+if page == main_section_labels[2]:
     st.header("Basic Statistical Reports")
     st.markdown("### Descriptive Statistics")
-    st.dataframe(df_clean.describe(include='all'))
+    st.dataframe(get_summary_statistics(data_key, df_clean))
     
     st.markdown("### Histograms for Numeric Variables")
-    numeric_cols = df_clean.select_dtypes(include=["number"]).columns
+    numeric_cols = get_numeric_columns(data_key, df_clean)
     for col in numeric_cols:
-        fig, ax = plt.subplots()
-        ax.hist(df_clean[col].dropna(), bins=20, color="skyblue", edgecolor="black")
-        ax.set_title(f"Histogram of {col}")
-        ax.set_xlabel(col)
-        ax.set_ylabel("Frequency")
-        st.pyplot(fig)
+        hist_counts = get_histogram_counts(data_key, col, df_clean, bins=20)
+        spec = get_histogram_spec(col, f"Histogram of {col}", y_title="Frequency")
+        st.vega_lite_chart(hist_counts, spec, use_container_width=True)
 
 # =========================
 # TAB 4: Enhanced Dashboard & Export
 # =========================
-with main_tabs[3]:
+if page == main_section_labels[3]:
     st.header("Enhanced Dashboard & Data Export")
-    df_dashboard = df_clean.copy()
-    if "Gender" in df_dashboard.columns:
-        genders = sorted(df_dashboard["Gender"].unique().tolist())
+    # All filters are combined into one row mask and applied once. A filter left at
+    # every option selects all rows, so it is skipped, and with no active filter
+    # the cleaned frame is used as-is without building a mask or indexing at all.
+    mask = None
+    active_filters = []
+    if "Gender" in df_clean.columns:
+        # Categories are already unique and sorted, so no scan of the column is needed
+        genders = df_clean["Gender"].cat.categories.tolist()
         selected_genders = st.multiselect("Select Gender(s):", options=genders, default=genders)
-        df_dashboard = df_dashboard[df_dashboard["Gender"].isin(selected_genders)]
-    if "Age" in df_dashboard.columns:
-        ages = sorted(df_dashboard["Age"].unique().tolist())
+        if len(selected_genders) < len(genders):
+            gender_mask = df_clean["Gender"].isin(selected_genders).to_numpy()
+            active_filters.append(("Gender", tuple(sorted(selected_genders))))
+            mask = gender_mask if mask is None else mask & gender_mask
+    if "Age" in df_clean.columns:
+        ages = df_clean["Age"].cat.categories.tolist()
         selected_ages = st.multiselect("Select Age Group(s):", options=ages, default=ages)
-        df_dashboard = df_dashboard[df_dashboard["Age"].isin(selected_ages)]
+        if len(selected_ages) < len(ages):
+            age_mask = df_clean["Age"].isin(selected_ages).to_numpy()
+            active_filters.append(("Age", tuple(sorted(selected_ages))))
+            mask = age_mask if mask is None else mask & age_mask
+    df_dashboard = df_clean if mask is None else df_clean[mask]
     st.markdown("#### Filtered Data")
-    st.dataframe(df_dashboard)
-    csv_data = df_dashboard.to_csv(index=False).encode("utf-8")
+    # Only a bounded number of rows is sent to the browser; the CSV export below has them all
+    max_rows = st.number_input("Rows to display:", min_value=1, value=1000, step=100)
+    st.dataframe(df_dashboard.head(int(max_rows)))
+    st.caption(f"Showing {min(int(max_rows), len(df_dashboard))} of {len(df_dashboard)} filtered rows.")
+    csv_data = get_csv_bytes(data_key, tuple(active_filters), df_dashboard)
     st.download_button(
         label="Download Filtered Data as CSV",
         data=csv_data,
@@ -272,7 +581,7 @@ with main_tabs[3]:
 # =========================
 # TAB 5: Geospatial Visualization
 # =========================
-with main_tabs[4]:
+if page == main_section_labels[4]:
     st.header("Geospatial Visualization")
     if "Location (Census Region)" in df_clean.columns:
         # Dummy coordinates for known Census Regions
@@ -287,18 +596,24 @@ with main_tabs[4]:
             "Mountain": {"lat": 39.0, "lon": -105.0},
             "Pacific": {"lat": 37.0, "lon": -120.0}
         }
-        df_geo = df_clean.copy()
-        df_geo = df_geo[df_geo["Location (Census Region)"].isin(region_coords.keys())]
-        df_geo["lat"] = df_geo["Location (Census Region)"].apply(lambda x: region_coords[x]["lat"])
-        df_geo["lon"] = df_geo["Location (Census Region)"].apply(lambda x: region_coords[x]["lon"])
-        st.map(df_geo[["lat", "lon"]])
+        lat_map = pd.Series({region: coords["lat"] for region, coords in region_coords.items()})
+        lon_map = pd.Series({region: coords["lon"] for region, coords in region_coords.items()})
+        # Only the two coordinate columns are built, instead of copying every column of the matching rows.
+        # Regions without coordinates map to NaN and are dropped; astype(float) because mapping a
+        # categorical can return a categorical.
+        regions = df_clean["Location (Census Region)"]
+        df_geo = pd.DataFrame({
+            "lat": regions.map(lat_map).astype(float),
+            "lon": regions.map(lon_map).astype(float)
+        }).dropna()
+        st.map(df_geo)
     else:
         st.write("No 'Location (Census Region)' column found.")
 
 # =========================
 # TAB 6: User Guide
 # =========================
-with main_tabs[5]:
+if page == main_section_labels[5]:
     st.header("User Guide")
     st.markdown("""
     ### User Guide